@@ -2,71 +2,250 @@
 """
 Cache Manager for Linkwarden Alfred Workflow
 
-Provides simple file-based caching with TTL support to reduce API calls
+Provides simple persistent caching with TTL support to reduce API calls
 and improve workflow responsiveness.
 
 Features:
-- File-based cache storage in system temp directory
+- Single-file SQLite cache storage in system temp directory
+- Compact binary (pickle) serialization with a format header
+- Compression of large values (zstandard when installed, zlib otherwise)
 - TTL (Time To Live) support with automatic expiration
 - Cache statistics for monitoring and testing
-- Thread-safe operations
+- Optional thread-safe mode (locking is skipped for single-threaded use)
 - Automatic cleanup of expired entries
+- In-process LRU layer so repeated lookups within one run skip the database
 
 Author: joscandreu
 """
 
 import os
-import json
 import time
+import zlib
+import pickle
+import sqlite3
 import tempfile
 import threading
-from typing import Any, Dict, Optional, Tuple
+import contextlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
+# zstandard is optional: it decompresses faster than zlib at a similar ratio,
+# but the workflow must keep working with a stock macOS Python.
+try:
+    import zstandard
+    HAS_ZSTD = True
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+except ImportError:
+    HAS_ZSTD = False
+
+
+# Every stored value starts with this header so blobs written by another
+# format (or another tool) are recognized and skipped instead of unpickled.
+# The header is followed by one byte telling how the pickle is compressed.
+CACHE_MAGIC = b'LWC2'
+
+_RAW = b'\x00'
+_ZLIB = b'\x01'
+_ZSTD = b'\x02'
+
+# Values smaller than this are stored uncompressed; compression would not
+# pay for itself on tiny payloads.
+COMPRESS_MIN_BYTES = 1024
+
+CACHE_DB_NAME = 'cache.sqlite'
+
+# Upper bound for SQLite's memory-mapped I/O on the cache database
+MMAP_SIZE = 32 * 1024 * 1024
+
+# Expired rows are kept this long so get_stale()/mget_stale() can still serve
+# them; get() only deletes rows that are past it. Must be at least the
+# longest max_stale_seconds passed to either.
+STALE_ROW_GRACE_SECONDS = 24 * 60 * 60
+
+# Bumped whenever the table layout changes; an older database is rebuilt
+# from scratch since its content is only a cache.
+SCHEMA_VERSION = 2
+
+# Entries written by older versions of the workflow (one file per key).
+# Nothing reads them any more, so cleanup removes them without opening them.
+LEGACY_CACHE_SUFFIXES = ('.json', '.pkl')
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a cache value to bytes, compressing large payloads."""
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) < COMPRESS_MIN_BYTES:
+        return CACHE_MAGIC + _RAW + payload
+    if HAS_ZSTD:
+        return CACHE_MAGIC + _ZSTD + _zstd_compressor.compress(payload)
+    return CACHE_MAGIC + _ZLIB + zlib.compress(payload, 3)
+
+
+def _loads(data: bytes) -> Any:
+    """Deserialize a cache value, raising ValueError for unknown formats."""
+    if not data.startswith(CACHE_MAGIC):
+        raise ValueError("Unknown cache value format")
+    header_len = len(CACHE_MAGIC) + 1
+    codec = data[len(CACHE_MAGIC):header_len]
+    try:
+        # Slice through a memoryview so the payload is not copied first
+        payload = memoryview(data)[header_len:]
+        if codec == _ZLIB:
+            payload = zlib.decompress(payload)
+        elif codec == _ZSTD:
+            if not HAS_ZSTD:
+                raise ValueError("zstandard is not installed")
+            payload = _zstd_decompressor.decompress(payload)
+        elif codec != _RAW:
+            raise ValueError(f"Unknown cache compression {codec!r}")
+        return pickle.loads(payload)
+    except ValueError:
+        raise
+    except Exception as e:
+        # pickle and the decompressors can raise almost anything on
+        # truncated or foreign data
+        raise ValueError(f"Corrupted cache value: {e}")
+
+
+STAT_NAMES = ('hits', 'misses', 'sets', 'expired', 'errors')
+
 
 class CacheManager:
     """
-    Simple file-based cache manager with TTL support.
+    Simple SQLite-backed cache manager with TTL support.
 
     This cache is optimized for the Alfred workflow use case where:
-    - Cache hit speed is critical (file-based is fast enough)
+    - Cache hit speed is critical (one indexed SELECT per lookup)
     - Data persistence across workflow runs is beneficial
     - Memory usage should be minimal
     - Network calls are the primary bottleneck
+
+    All entries live in a single database file, so lookups do not depend on
+    how many entries exist and cleanup is a single DELETE statement.
     """
 
-    def __init__(self, cache_dir: Optional[str] = None):
+    def __init__(self, cache_dir: Optional[str] = None, thread_safe: bool = False):
         """
         Initialize cache manager.
 
         Args:
-            cache_dir: Custom cache directory path. If None, uses system temp.
+            cache_dir: Custom cache directory path. If None, uses the
+                workflow cache directory Alfred provides (alfred_workflow_cache),
+                falling back to system temp outside Alfred.
+            thread_safe: Serialize access with real locks so the manager can be
+                shared between threads. Alfred scripts are single-threaded,
+                so by default locking is skipped entirely.
         """
-        self.cache_dir = Path(cache_dir) if cache_dir else Path(tempfile.gettempdir()) / "linkwarden_cache"
-        self.cache_dir.mkdir(exist_ok=True)
-
-        # Cache statistics for monitoring
-        self.stats = {
-            'hits': 0,
-            'misses': 0,
-            'sets': 0,
-            'expired': 0,
-            'errors': 0
-        }
-
-        # Thread lock for stats (overkill for Alfred but good practice)
-        self._stats_lock = threading.Lock()
-
-    def _get_cache_file(self, key: str) -> Path:
-        """Get cache file path for a given key."""
-        safe_key = "".join(c for c in key if c.isalnum() or c in ('_', '-', '.'))
-        return self.cache_dir / f"{safe_key}.json"
-
-    def _is_expired(self, cache_data: Dict) -> bool:
-        """Check if cache entry has expired."""
-        if 'expires_at' not in cache_data:
-            return True
-        return time.time() > cache_data['expires_at']
+        if not cache_dir:
+            cache_dir = os.environ.get('alfred_workflow_cache') or os.path.join(tempfile.gettempdir(), "linkwarden_cache")
+        self.cache_dir = Path(cache_dir)
+        # Alfred only names the workflow cache directory; it may not exist yet
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._cache_dir_str = str(self.cache_dir)
+        self.db_path = os.path.join(self._cache_dir_str, CACHE_DB_NAME)
+
+        self.thread_safe = thread_safe
+
+        # Opened lazily so constructing the manager stays free
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = self._new_lock()
+
+        # Cache statistics for monitoring. Each thread bumps its own counter
+        # dict without locking; get_stats() sums them on demand.
+        self._tls = threading.local()
+        self._all_counters = []
+
+        # Guards registration and reset of per-thread counters; bumping and
+        # reading them is lock-free
+        self._stats_lock = self._new_lock()
+
+        # In-process LRU of key -> (expires_at, value). Alfred runs a fresh
+        # process per keystroke, but a single run often looks up the same key
+        # several times (e.g. collections for filtering and for display).
+        self._mem: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._mem_max_entries = 128
+        self._mem_lock = self._new_lock()
+
+    def _new_lock(self):
+        """Create a real lock when thread_safe, otherwise a no-op context."""
+        if self.thread_safe:
+            return threading.Lock()
+        return contextlib.nullcontext()
+
+    def _db(self) -> sqlite3.Connection:
+        """Get the database connection, creating the schema on first use."""
+        if self._conn is None:
+            # Autocommit mode; WAL lets concurrent Alfred runs read while
+            # another one writes.
+            # Without locking, let sqlite3 reject use from another thread
+            # rather than risk concurrent access to one connection.
+            conn = sqlite3.connect(self.db_path, timeout=2, isolation_level=None,
+                                   check_same_thread=not self.thread_safe)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Read pages straight from a memory-mapped view of the database
+            # file instead of copying them through SQLite's page cache, which
+            # matters for large cached search/collection lists.
+            conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS cache")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, "
+                "value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL)"
+            )
+            # Lets cleanup_expired find expired rows by range scan instead of
+            # visiting every entry
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+            )
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn = conn
+        return self._conn
+
+    def _counters(self) -> Dict[str, int]:
+        """Get the calling thread's counter dict, registering it on first use."""
+        counters = getattr(self._tls, 'counters', None)
+        if counters is None:
+            counters = dict.fromkeys(STAT_NAMES, 0)
+            self._tls.counters = counters
+            with self._stats_lock:
+                self._all_counters.append(counters)
+        return counters
+
+    def _bump(self, name: str, amount: int = 1):
+        """Increment a statistics counter for the calling thread."""
+        self._counters()[name] += amount
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        """Store an entry in the in-process LRU, evicting the oldest if full."""
+        with self._mem_lock:
+            self._mem[key] = (expires_at, value)
+            self._mem.move_to_end(key)
+            if len(self._mem) > self._mem_max_entries:
+                self._mem.popitem(last=False)
+
+    def _remove_legacy_files(self) -> int:
+        """Delete per-key cache files left behind by older workflow versions."""
+        removed = 0
+        try:
+            with os.scandir(self._cache_dir_str) as entries:
+                for entry in entries:
+                    if entry.name.endswith(LEGACY_CACHE_SUFFIXES):
+                        try:
+                            os.unlink(entry.path)
+                            removed += 1
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        return removed
 
     def get(self, key: str) -> Tuple[Optional[Any], bool]:
         """
@@ -78,35 +257,66 @@ class CacheManager:
         Returns:
             Tuple of (value, hit) where hit indicates if cache was hit
         """
-        cache_file = self._get_cache_file(key)
+        now = time.time()
+        with self._mem_lock:
+            memo = self._mem.get(key)
+            if memo is not None:
+                if now < memo[0]:
+                    self._mem.move_to_end(key)
+                    self._bump('hits')
+                    return memo[1], True
+                del self._mem[key]
 
         try:
-            if not cache_file.exists():
-                with self._stats_lock:
-                    self.stats['misses'] += 1
-                return None, False
-
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-
-            if self._is_expired(cache_data):
-                # Remove expired file
-                cache_file.unlink(missing_ok=True)
-                with self._stats_lock:
-                    self.stats['expired'] += 1
-                    self.stats['misses'] += 1
-                return None, False
+            with self._db_lock:
+                db = self._db()
+                row = db.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+
+                if row is None:
+                    self._bump('misses')
+                    return None, False
+
+                blob, expires_at = row
+                if now > expires_at:
+                    # Remove the expired entry unless get_stale may still serve it
+                    if now > expires_at + STALE_ROW_GRACE_SECONDS:
+                        db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                        self._bump('expired')
+                    self._bump('misses')
+                    return None, False
+
+            value = _loads(blob)
+            self._remember(key, expires_at, value)
+            self._bump('hits')
+            return value, True
+
+        except (sqlite3.Error, ValueError):
+            # Unreadable database or foreign value format, treat as cache miss
+            self._bump('errors')
+            self._bump('misses')
+            return None, False
 
-            with self._stats_lock:
-                self.stats['hits'] += 1
-            return cache_data['value'], True
+    def get_stale(self, key: str, max_stale_seconds: float) -> Tuple[Optional[Any], bool, bool]:
+        """
+        Get value from cache, also accepting entries that expired recently.
 
-        except Exception as e:
-            # On any error, treat as cache miss
-            with self._stats_lock:
-                self.stats['errors'] += 1
-                self.stats['misses'] += 1
-            return None, False
+        Used for stale-while-revalidate: the caller can return a stale value
+        immediately and refresh it in the background.
+
+        Args:
+            key: Cache key
+            max_stale_seconds: How long past its TTL an entry may still be returned
+
+        Returns:
+            Tuple of (value, hit, stale) where stale indicates the entry is past its TTL
+        """
+        found = self.mget_stale([key], max_stale_seconds)
+        if key in found:
+            value, stale = found[key]
+            return value, True, stale
+        return None, False, False
 
     def set(self, key: str, value: Any, ttl_seconds: int = 300) -> bool:
         """
@@ -114,33 +324,87 @@ class CacheManager:
 
         Args:
             key: Cache key
-            value: Value to cache (must be JSON serializable)
+            value: Value to cache (must be picklable)
             ttl_seconds: Time to live in seconds (default: 5 minutes)
 
         Returns:
             True if successfully cached, False otherwise
         """
-        cache_file = self._get_cache_file(key)
-
         try:
-            cache_data = {
-                'value': value,
-                'expires_at': time.time() + ttl_seconds,
-                'created_at': time.time()
-            }
+            expires_at = time.time() + ttl_seconds
+            blob = _dumps(value)
 
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            with self._db_lock:
+                self._db().execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, blob, expires_at)
+                )
+            self._remember(key, expires_at, value)
 
-            with self._stats_lock:
-                self.stats['sets'] += 1
+            self._bump('sets')
             return True
 
         except Exception as e:
-            with self._stats_lock:
-                self.stats['errors'] += 1
+            self._bump('errors')
             return False
 
+    def mget_stale(self, keys: List[str], max_stale_seconds: float) -> Dict[str, Tuple[Any, bool]]:
+        """
+        Batched get_stale(): look up several keys in one database round trip.
+
+        Args:
+            keys: Cache keys
+            max_stale_seconds: How long past its TTL an entry may still be returned
+
+        Returns:
+            Dictionary of key -> (value, stale) for every key that was a hit;
+            missing keys and entries expired for longer are left out
+        """
+        found = {}
+        pending = []
+        now = time.time()
+
+        with self._mem_lock:
+            for key in dict.fromkeys(keys):
+                memo = self._mem.get(key)
+                if memo is not None and now < memo[0] + max_stale_seconds:
+                    self._mem.move_to_end(key)
+                    found[key] = (memo[1], now >= memo[0])
+                    self._bump('hits')
+                else:
+                    pending.append(key)
+
+        if not pending:
+            return found
+
+        try:
+            placeholders = ', '.join('?' * len(pending))
+            with self._db_lock:
+                rows = self._db().execute(
+                    f"SELECT key, value, expires_at FROM cache WHERE key IN ({placeholders})",
+                    pending
+                ).fetchall()
+
+            for key, blob, expires_at in rows:
+                if now >= expires_at + max_stale_seconds:
+                    continue
+                try:
+                    value = _loads(blob)
+                except ValueError:
+                    # Foreign value format, treat as cache miss
+                    self._bump('errors')
+                    continue
+                self._remember(key, expires_at, value)
+                found[key] = (value, now >= expires_at)
+                self._bump('hits')
+
+        except sqlite3.Error:
+            # Unreadable database, treat as cache miss
+            self._bump('errors')
+
+        self._bump('misses', sum(1 for key in pending if key not in found))
+        return found
+
     def delete(self, key: str) -> bool:
         """
         Delete specific cache entry.
@@ -151,15 +415,14 @@ class CacheManager:
         Returns:
             True if deleted, False if not found or error
         """
-        cache_file = self._get_cache_file(key)
+        with self._mem_lock:
+            self._mem.pop(key, None)
         try:
-            if cache_file.exists():
-                cache_file.unlink()
-                return True
-            return False
-        except Exception:
-            with self._stats_lock:
-                self.stats['errors'] += 1
+            with self._db_lock:
+                cursor = self._db().execute("DELETE FROM cache WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+        except sqlite3.Error:
+            self._bump('errors')
             return False
 
     def clear(self) -> int:
@@ -167,52 +430,78 @@ class CacheManager:
         Clear all cache entries.
 
         Returns:
-            Number of files deleted
+            Number of entries deleted
         """
+        with self._mem_lock:
+            self._mem.clear()
         deleted_count = 0
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    cache_file.unlink()
-                    deleted_count += 1
-                except Exception:
-                    pass
-        except Exception:
+            with self._db_lock:
+                cursor = self._db().execute("DELETE FROM cache")
+            deleted_count += cursor.rowcount
+        except sqlite3.Error:
             pass
+        deleted_count += self._remove_legacy_files()
         return deleted_count
 
     def cleanup_expired(self) -> int:
         """
         Remove all expired cache entries.
 
+        Entries are kept for STALE_ROW_GRACE_SECONDS past their TTL so that
+        get_stale() can still serve them while a refresh runs.
+
         Returns:
             Number of expired entries removed
         """
         expired_count = 0
+        cutoff = time.time() - STALE_ROW_GRACE_SECONDS
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    with open(cache_file, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-
-                    if self._is_expired(cache_data):
-                        cache_file.unlink()
-                        expired_count += 1
-
-                except Exception:
-                    # If we can't read the file, consider it corrupted and remove it
-                    try:
-                        cache_file.unlink()
-                        expired_count += 1
-                    except Exception:
-                        pass
-        except Exception:
+            with self._db_lock:
+                db = self._db()
+                keys = [row[0] for row in db.execute(
+                    "SELECT key FROM cache WHERE expires_at < ?", (cutoff,)
+                )]
+                if keys:
+                    db.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+            expired_count += len(keys)
+            with self._mem_lock:
+                for key in keys:
+                    self._mem.pop(key, None)
+        except sqlite3.Error:
             pass
+        expired_count += self._remove_legacy_files()
 
-        with self._stats_lock:
-            self.stats['expired'] += expired_count
+        self._bump('expired', expired_count)
         return expired_count
 
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        List all stored entries, including expired ones not yet cleaned up.
+
+        Returns:
+            List of dicts with 'key', 'value', 'expires_at' and 'size_bytes';
+            'value' is None if it cannot be decoded
+        """
+        with self._db_lock:
+            rows = self._db().execute(
+                "SELECT key, value, expires_at FROM cache ORDER BY key"
+            ).fetchall()
+
+        result = []
+        for key, blob, expires_at in rows:
+            try:
+                value = _loads(blob)
+            except ValueError:
+                value = None
+            result.append({
+                'key': key,
+                'value': value,
+                'expires_at': expires_at,
+                'size_bytes': len(blob)
+            })
+        return result
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
@@ -220,8 +509,15 @@ class CacheManager:
         Returns:
             Dictionary with cache statistics including hit rate
         """
-        with self._stats_lock:
-            stats = self.stats.copy()
+        # No lock: copying the registry list and reading int counters are each
+        # atomic under the GIL. A thread bumping a counter meanwhile can make
+        # the totals lag by a few operations, which is fine for monitoring.
+        all_counters = list(self._all_counters)
+
+        stats = dict.fromkeys(STAT_NAMES, 0)
+        for counters in all_counters:
+            for name in STAT_NAMES:
+                stats[name] += counters[name]
 
         total_requests = stats['hits'] + stats['misses']
         stats['hit_rate'] = stats['hits'] / total_requests if total_requests > 0 else 0.0
@@ -232,34 +528,39 @@ class CacheManager:
     def reset_stats(self):
         """Reset cache statistics."""
         with self._stats_lock:
-            self.stats = {
-                'hits': 0,
-                'misses': 0,
-                'sets': 0,
-                'expired': 0,
-                'errors': 0
-            }
+            for counters in self._all_counters:
+                for name in STAT_NAMES:
+                    counters[name] = 0
 
     def cache_info(self) -> Dict[str, Any]:
         """
         Get comprehensive cache information.
 
         Returns:
-            Dictionary with cache directory, file count, and statistics
+            Dictionary with cache directory, entry count, and statistics
         """
         file_count = 0
         total_size = 0
 
         try:
-            for cache_file in self.cache_dir.glob("*.json"):
-                if cache_file.is_file():
-                    file_count += 1
-                    total_size += cache_file.stat().st_size
-        except Exception:
+            with self._db_lock:
+                file_count = self._db().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        except sqlite3.Error:
+            pass
+
+        # The database plus its WAL and shared-memory side files, from a single
+        # directory listing rather than probing each possible name
+        try:
+            with os.scandir(self._cache_dir_str) as entries:
+                for entry in entries:
+                    if entry.name.startswith(CACHE_DB_NAME) and entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+        except OSError:
             pass
 
         return {
             'cache_dir': str(self.cache_dir),
+            'db_path': self.db_path,
             'file_count': file_count,
             'total_size_bytes': total_size,
             'stats': self.get_stats()
@@ -287,4 +588,4 @@ def clear_cache():
 def cache_stats():
     """Get global cache statistics."""
     cache = get_cache()
-    return cache.get_stats()
\ No newline at end of file
+    return cache.get_stats()
@@ -18,13 +18,118 @@ Repository: https://github.com/joscandreu/linkwarden-alfred-workflow
 """
 
 import os
+import re
 import json
-import urllib.request
+import hashlib
 import urllib.parse
-import urllib.error
 import sys
-from typing import Dict, List, Optional, Any
-from cache_manager import get_cache
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+
+if TYPE_CHECKING:
+    # Only for annotations; both are imported lazily at runtime
+    import http.client
+    from concurrent.futures import ThreadPoolExecutor
+
+# orjson is optional: it parses API responses and serializes Alfred output
+# several times faster, but the workflow must keep working with a stock macOS
+# Python.
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# ijson is optional as well and lets link searches stop parsing once enough
+# links have been read. It is comparatively slow to import, so it is only
+# loaded when a link search actually hits the network (see _load_ijson).
+_ijson = None
+_ijson_checked = False
+
+# http.client, concurrent.futures, subprocess and cache_manager are imported
+# where they are first needed: Alfred starts a fresh interpreter for every
+# keystroke, and a run answered from cache never touches most of them.
+
+# Expired tag/collection lists are still served for this long while a
+# background refresh runs (stale-while-revalidate). Must not exceed
+# cache_manager.STALE_ROW_GRACE_SECONDS, or the rows are gone before then.
+STALE_GRACE_SECONDS = 24 * 60 * 60
+
+# How long a background refresh may run before another one can be started
+REFRESH_GATE_SECONDS = 60
+
+# How long to remember that the server has no bulk POST /tags endpoint
+BULK_TAGS_UNSUPPORTED_TTL = 24 * 60 * 60
+
+# How long to remember that the server rejects a collection on link creation
+COLLECTION_POST_UNSUPPORTED_TTL = 24 * 60 * 60
+
+# How long a search that found nothing is answered from cache. Alfred re-runs
+# the search on every keystroke, so a query often repeats within seconds.
+NEGATIVE_SEARCH_TTL = 30
+
+# Query syntax shared by lw and lws: a token starting with # or @ names a tag or
+# collection (the whole token, so #foo-bar is the tag "foo-bar"), anything else
+# is plain text. A bare # or @ is a filter still being typed and is skipped.
+# Compiled once since a query is parsed on every keystroke.
+_QUERY_TOKEN_RE = re.compile(r'#(?P<tag>\S*)|@(?P<col>\S*)|(?P<txt>\S+)')
+
+# Upper bound on parallel requests when a search fans out over several filters
+MAX_CONCURRENT_REQUESTS = 8
+
+
+def _load_ijson():
+    """Import ijson on first use; returns None when it isn't installed"""
+    global _ijson, _ijson_checked
+    if not _ijson_checked:
+        try:
+            import ijson
+            _ijson = ijson
+        except ImportError:
+            _ijson = None
+        _ijson_checked = True
+    return _ijson
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse a UTF-8 JSON document"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_json(obj: Any):
+    """Write a JSON document and a newline to stdout"""
+    out = getattr(sys.stdout, 'buffer', None)
+    if out is None:
+        # stdout replaced by a text-only stream
+        print(_json_dumps(obj).decode('utf-8'))
+        return
+    sys.stdout.flush()
+    out.write(_json_dumps(obj) + b'\n')
+    out.flush()
+
+
+class APIRequestError(Exception):
+    """
+    Raised when a request to the Linkwarden API fails.
+
+    str(error) carries the raw HTTP/connection detail, while user_message holds
+    the friendlier text shown in Alfred.
+    """
+
+    def __init__(self, message: str, user_message: Optional[str] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.user_message = user_message or message
+        self.status = status
 
 
 class LinkwardenAPI:
@@ -51,6 +156,9 @@ class LinkwardenAPI:
         - LW_API_URL: Base URL of Linkwarden instance (e.g., https://linkwarden.example.com)
         - LW_API_TOKEN: API token from Linkwarden Settings → Access Tokens
 
+        Optional Debugging:
+        - LW_DEBUG: Set to 1 to log requests, responses and cache activity to stderr
+
         Optional Cache Configuration:
         - LW_CACHE_COLLECTIONS_TTL: TTL for collections cache in seconds (default: 600 = 10 minutes)
         - LW_CACHE_TAGS_TTL: TTL for tags cache in seconds (default: 600 = 10 minutes)
@@ -59,12 +167,46 @@ class LinkwardenAPI:
         self.api_url = os.environ.get('LW_API_URL', '').rstrip('/')
         self.api_token = os.environ.get('LW_API_TOKEN', '')
         self.output_alfred_format = output_alfred_format
-        self.cache = get_cache()
+        self._debug = os.environ.get('LW_DEBUG', '').strip().lower() in ('1', 'true', 'yes')
+        self._cache = None
+        self._executor = None
+
+        # Cache keys are scoped to the instance and token. hash() is salted per
+        # process, and Alfred starts a new process for every keystroke, so use
+        # a stable digest instead.
+        key_suffix = hashlib.blake2b(self.api_token.encode('utf-8'), digest_size=4).hexdigest()
+        self._cache_key_suffix = f"{self.api_url}_{key_suffix}"
+        self._cache_key_collections = f"collections_{self._cache_key_suffix}"
+        self._cache_key_tags = f"tags_{self._cache_key_suffix}"
+
+        # Name lookups for create_link, memoized per source list (see _tag_index_for)
+        self._tag_index = None
+        self._tag_index_src = None
+        self._collection_index = None
+        self._collection_index_src = None
+
+        # Build the request target and headers once; connections are kept
+        # alive per thread (see _connection)
+        base = urllib.parse.urlsplit(self.api_url)
+        self._base_scheme = base.scheme
+        self._base_host = base.netloc
+        self._base_url = f"{self.api_url}/api/v1"
+        self._base_path = f"{base.path}/api/v1"
+        self._headers = {
+            'Authorization': f'Bearer {self.api_token}',
+            'Content-Type': 'application/json',
+            'User-Agent': 'Linkwarden-Alfred-Workflow/1.0 (joscandreu)'
+        }
+        self._local = threading.local()
+
+        # Proxy for the API host, looked up when the first connection is made
+        # (see _proxy_settings)
+        self._proxy = None
+        self._proxy_resolved = False
+        self._proxy_prefix = ''
 
-        # Configure cache TTLs with environment variables or defaults
-        self.cache_ttl_collections = self._get_ttl_from_env('LW_CACHE_COLLECTIONS_TTL', 600)  # 10 minutes
-        self.cache_ttl_tags = self._get_ttl_from_env('LW_CACHE_TAGS_TTL', 600)  # 10 minutes
-        self.cache_ttl_search = self._get_ttl_from_env('LW_CACHE_SEARCH_TTL', 120)  # 2 minutes
+        # Cache TTLs are read from the environment on first use (see _ttl)
+        self._ttls = {}
 
         # Validate required configuration
         if not self.api_url or not self.api_token:
@@ -110,13 +252,47 @@ class LinkwardenAPI:
                 print(f"{env_var}={ttl} is too high, using maximum of 24 hours", file=sys.stderr)
                 return 86400
 
-            print(f"Cache TTL configured: {env_var}={ttl}s ({ttl//60}m)", file=sys.stderr)
             return ttl
 
         except ValueError:
             print(f"Invalid {env_var}='{value}', using default {default}s", file=sys.stderr)
             return default
 
+    def _ttl(self, env_var: str, default: int) -> int:
+        """Get a TTL from the environment, parsing and validating it only once"""
+        ttl = self._ttls.get(env_var)
+        if ttl is None:
+            ttl = self._ttls[env_var] = self._get_ttl_from_env(env_var, default)
+        return ttl
+
+    @property
+    def cache_ttl_collections(self) -> int:
+        """Collections cache TTL in seconds (LW_CACHE_COLLECTIONS_TTL, default 10 minutes)"""
+        return self._ttl('LW_CACHE_COLLECTIONS_TTL', 600)
+
+    @property
+    def cache_ttl_tags(self) -> int:
+        """Tags cache TTL in seconds (LW_CACHE_TAGS_TTL, default 10 minutes)"""
+        return self._ttl('LW_CACHE_TAGS_TTL', 600)
+
+    @property
+    def cache_ttl_search(self) -> int:
+        """Search results cache TTL in seconds (LW_CACHE_SEARCH_TTL, default 2 minutes)"""
+        return self._ttl('LW_CACHE_SEARCH_TTL', 120)
+
+    @property
+    def cache(self):
+        """The workflow's shared CacheManager, opened on first use"""
+        if self._cache is None:
+            from cache_manager import get_cache
+            self._cache = get_cache()
+        return self._cache
+
+    def _log(self, message: str):
+        """Print a diagnostic message to stderr when LW_DEBUG is enabled"""
+        if self._debug:
+            print(message, file=sys.stderr)
+
     def get_cache_config(self) -> Dict[str, Any]:
         """
         Get current cache configuration.
@@ -149,71 +325,250 @@ class LinkwardenAPI:
         Raises:
             SystemExit: On authentication or connection errors
         """
-        url = f"{self.api_url}/api/v1{endpoint}"
+        try:
+            return self._request(endpoint, method, data)
+        except APIRequestError as e:
+            self._handle_request_error(e)
 
-        headers = {
-            'Authorization': f'Bearer {self.api_token}',
-            'Content-Type': 'application/json',
-            'User-Agent': 'Linkwarden-Alfred-Workflow/1.0 (joscandreu)'
-        }
+    def _request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None,
+                 consume=None) -> Any:
+        """
+        Perform the HTTP request without any Alfred/CLI error reporting.
+
+        This is the part of _make_request that is safe to run from worker
+        threads: failures are raised as APIRequestError and left to the caller.
+
+        Args:
+            consume: Optional callable that reads a successful response itself
+                     and returns the result, instead of parsing the whole body
+
+        Raises:
+            APIRequestError: On HTTP, connection or decoding errors
+        """
+        import http.client
+
+        path = self._base_path + endpoint
 
         try:
-            if method == 'GET':
-                req = urllib.request.Request(url, headers=headers)
-            else:  # POST, PUT, PATCH
-                json_data = json.dumps(data).encode('utf-8') if data else b''
-                print(f"API Request: {method} {url}", file=sys.stderr)
-                print(f"Request data: {json.dumps(data, indent=2)}", file=sys.stderr)
-                req = urllib.request.Request(url, data=json_data, headers=headers)
-                req.get_method = lambda: method
-
-            with urllib.request.urlopen(req, timeout=30) as response:
-                response_data = json.loads(response.read().decode('utf-8'))
-                print(f"API Response: {json.dumps(response_data, indent=2)}", file=sys.stderr)
-                return response_data
-
-        except urllib.error.HTTPError as e:
-            error_msg = f"HTTP {e.code}: {e.reason}"
+            body = None
+            if method != 'GET':  # POST, PUT, PATCH
+                body = _json_dumps(data) if data else b''
+                self._log(f"API Request: {method} {self._base_url}{endpoint}")
+                if self._debug:
+                    print(f"Request data: {json.dumps(data, indent=2)}", file=sys.stderr)
+
+            status, reason, payload = self._send(method, path, body, consume)
+        except (OSError, http.client.HTTPException) as e:
+            raise APIRequestError(f"Connection error: {e}")
+        except ValueError as e:
+            # Malformed JSON while streaming the body
+            raise APIRequestError(f"Unexpected error: {str(e)}")
+
+        if status >= 400:
+            error_msg = f"HTTP {status}: {reason}"
+            error_body = None
             try:
                 # Try to get more detailed error information
-                error_body = e.read().decode('utf-8')
+                error_body = payload.decode('utf-8')
                 if error_body:
                     error_msg += f" - {error_body}"
             except:
                 pass
 
-            if e.code == 401:
+            detail = f"HTTP {status}: {reason} - {error_body if error_body is not None else error_msg}"
+
+            if status == 401:
                 error_msg = "Invalid API token. Please check LW_API_TOKEN in workflow variables."
-            elif e.code == 404:
+            elif status == 404:
                 error_msg = "API endpoint not found. Please check LW_API_URL in workflow variables."
-            elif e.code == 409:
+            elif status == 409:
                 error_msg = f"Conflict: {error_msg}. Link may already exist."
-            elif e.code == 400:
+            elif status == 400:
                 error_msg = f"Bad request: {error_msg}. Check the data being sent to the API."
 
-            if self.output_alfred_format:
-                self._output_error(error_msg)
-                sys.exit(1)
-            else:
-                print(f"API Error: {error_msg}", file=sys.stderr)
-                # Raise exception instead of sys.exit() for save action to handle
-                raise Exception(f"HTTP {e.code}: {e.reason} - {error_body if 'error_body' in locals() else error_msg}")
-        except urllib.error.URLError as e:
-            error_msg = f"Connection error: {e.reason}"
-            if self.output_alfred_format:
-                self._output_error(error_msg)
-                sys.exit(1)
-            else:
-                print(f"{error_msg}", file=sys.stderr)
-                raise Exception(error_msg)
+            raise APIRequestError(detail, error_msg, status)
+
+        if 300 <= status < 400:
+            raise APIRequestError(
+                f"HTTP {status}: {reason}",
+                f"API redirected (HTTP {status}). Please check LW_API_URL in workflow variables."
+            )
+
+        if consume is not None:
+            return payload
+
+        try:
+            response_data = _json_loads(payload)
         except Exception as e:
-            error_msg = f"Unexpected error: {str(e)}"
-            if self.output_alfred_format:
-                self._output_error(error_msg)
-                sys.exit(1)
+            raise APIRequestError(f"Unexpected error: {str(e)}")
+
+        if self._debug:
+            print(f"API Response: {json.dumps(response_data, indent=2)}", file=sys.stderr)
+        return response_data
+
+    def _connection(self) -> 'http.client.HTTPConnection':
+        """
+        Get this thread's persistent connection to the Linkwarden host.
+
+        Connections are kept open between requests so that follow-up calls
+        (e.g. the POST + PUT in create_link, or fanned-out search requests)
+        skip the TCP and TLS handshake. http.client connections are not
+        thread-safe, so each thread gets its own.
+        """
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            import http.client
+            proxy = self._proxy_settings()
+            connection_class = (http.client.HTTPSConnection if self._base_scheme == 'https'
+                                else http.client.HTTPConnection)
+            if proxy is None:
+                conn = connection_class(self._base_host, timeout=30)
             else:
-                print(f"{error_msg}", file=sys.stderr)
-                raise Exception(error_msg)
+                proxy_host, proxy_headers = proxy
+                conn = connection_class(proxy_host, timeout=30)
+                if self._base_scheme == 'https':
+                    # TLS to the API host through a CONNECT tunnel, as urllib does
+                    conn.set_tunnel(self._base_host, headers=proxy_headers)
+            self._local.connection = conn
+        return conn
+
+    def _proxy_settings(self) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Find the proxy to use for the API host, the way urllib does.
+
+        Honours the *_proxy/no_proxy environment variables and, on macOS, the
+        system proxy settings. Plain HTTP requests through a proxy are sent
+        with absolute URLs (see _send).
+
+        Returns:
+            (proxy host[:port], Proxy-Authorization headers), or None for a
+            direct connection
+        """
+        if not self._proxy_resolved:
+            import urllib.request
+
+            proxy_url = urllib.request.getproxies().get(self._base_scheme)
+            hostname = urllib.parse.urlsplit(self.api_url).hostname or ''
+            if proxy_url and not urllib.request.proxy_bypass(hostname):
+                if '://' not in proxy_url:
+                    proxy_url = f"http://{proxy_url}"
+                proxy = urllib.parse.urlsplit(proxy_url)
+                proxy_headers = {}
+                if proxy.username is not None:
+                    import base64
+                    credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+                    proxy_headers['Proxy-Authorization'] = f"Basic {base64.b64encode(credentials.encode('utf-8')).decode('ascii')}"
+                proxy_host = proxy.netloc.rpartition('@')[2]
+                self._proxy = (proxy_host, proxy_headers)
+                if self._base_scheme != 'https':
+                    self._proxy_prefix = f"{self._base_scheme}://{self._base_host}"
+                    self._headers = {**self._headers, **proxy_headers}
+                self._log(f"Using proxy {proxy_host}")
+            self._proxy_resolved = True
+        return self._proxy
+
+    def _send(self, method: str, path: str, body: Optional[bytes], consume=None):
+        """
+        Send one request over the pooled connection.
+
+        Args:
+            consume: Optional callable used to read a 2xx response in place of
+                     response.read(); it must leave the body fully read
+
+        Returns:
+            tuple: (status, reason, response body bytes or consume() result)
+        """
+        import http.client
+
+        conn = self._connection()
+        path = self._proxy_prefix + path
+        reused = conn.sock is not None
+        try:
+            conn.request(method, path, body=body, headers=self._headers)
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            # The server may drop an idle keep-alive connection; retry once on
+            # a fresh one, but never re-send a non-idempotent POST
+            if not reused or method == 'POST':
+                raise
+            conn.request(method, path, body=body, headers=self._headers)
+            response = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
+        try:
+            if consume is not None and 200 <= response.status < 300:
+                return response.status, response.reason, consume(response)
+            return response.status, response.reason, response.read()
+        except Exception:
+            conn.close()
+            raise
+
+    def _handle_request_error(self, error: 'APIRequestError'):
+        """Report a failed request the way this client was configured to"""
+        if self.output_alfred_format:
+            self._output_error(error.user_message)
+            sys.exit(1)
+        else:
+            print(f"API Error: {error.user_message}", file=sys.stderr)
+            # Raise exception instead of sys.exit() for save action to handle
+            raise error
+
+    def _request_or_error(self, endpoint: str):
+        """Run a GET request, returning the APIRequestError instead of raising it"""
+        try:
+            return self._request(endpoint)
+        except APIRequestError as e:
+            return e
+
+    def _fetch_links(self, endpoint: str, limit: int) -> List[Dict]:
+        """
+        GET a /links endpoint and return at most limit links.
+
+        With ijson installed the response is parsed incrementally and parsing
+        stops once limit links have been built; the rest of the body is only
+        drained so the connection can be reused. Otherwise the whole response
+        is parsed and sliced.
+
+        Raises:
+            APIRequestError: On HTTP, connection or decoding errors
+        """
+        ijson = _load_ijson()
+        if ijson is None:
+            return self._request(endpoint).get('response', [])[:limit]
+
+        def consume(response):
+            links = []
+            if limit > 0:
+                try:
+                    for link in ijson.items(response, 'response.item', use_float=True):
+                        links.append(link)
+                        if len(links) >= limit:
+                            break
+                except ijson.JSONError as e:
+                    # ijson's errors don't derive from ValueError; re-raise as
+                    # one so _request reports it like any malformed response
+                    raise ValueError(f"Malformed JSON response: {' '.join(str(e).split())}") from e
+            response.read()
+            return links
+
+        return self._request(endpoint, consume=consume)
+
+    def _fetch_links_or_error(self, endpoint: str, limit: int):
+        """Like _fetch_links, returning the APIRequestError instead of raising it"""
+        try:
+            return self._fetch_links(endpoint, limit)
+        except APIRequestError as e:
+            return e
+
+    def _get_executor(self) -> 'ThreadPoolExecutor':
+        """Lazily create the thread pool used to fan out independent requests"""
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+        return self._executor
 
     def search_links(self, query: str = "", collection_ids: List[str] = None,
                     tag_ids: List[str] = None, collection_id: Optional[str] = None,
@@ -234,6 +589,22 @@ class LinkwardenAPI:
         collection_ids = list(set(collection_ids))
         tag_ids = list(set(tag_ids))
 
+        # Searches that recently found nothing are not sent again. Each entry
+        # records when its search started; creating a link or collection
+        # retires every entry recorded before it. That is only checked on a
+        # hit, so the usual miss costs a single cache read.
+        search_key = '\x1f'.join([query,
+                                  ','.join(sorted(map(str, collection_ids))),
+                                  ','.join(sorted(map(str, tag_ids)))])
+        empty_key = (f"search_empty_{self._cache_key_suffix}_"
+                     f"{hashlib.blake2b(search_key.encode('utf-8'), digest_size=8).hexdigest()}")
+        searched_at, known_empty = self.cache.get(empty_key)
+        if known_empty and searched_at > self._negative_searches_invalidated_at():
+            self._log(f"Negative search cache HIT for '{query}'")
+            return []
+        searched_at = time.time_ns()
+        search_failed = False
+
         # For multiple filters, we'll need to make separate requests and combine results
         # since the API may not support multiple collection/tag IDs directly
         all_links = []
@@ -256,129 +627,370 @@ class LinkwardenAPI:
                 for tag_id in tag_ids:
                     search_combinations.append({'collection': None, 'tag': tag_id})
 
-            seen_links = set()
-            for combo in search_combinations:
-                params = {}
-
-                if query:
-                    params['searchQueryString'] = query
-                    params['searchByName'] = 'true'
-                    params['searchByUrl'] = 'true'
-                    params['searchByDescription'] = 'true'
-                    params['searchByTextContent'] = 'true'
-                    params['searchByTags'] = 'true'
-
-                if combo['collection']:
-                    params['collectionId'] = combo['collection']
-                if combo['tag']:
-                    params['tagId'] = combo['tag']
-
-                params['sort'] = 'createdAt'
-                params['cursor'] = '0'
-
-                query_string = urllib.parse.urlencode(params)
-                endpoint = f"/links?{query_string}"
+            endpoints = [self._links_endpoint(query, combo['collection'], combo['tag'])
+                         for combo in search_combinations]
 
-                try:
-                    response = self._make_request(endpoint)
-                    links = response.get('response', [])
-
-                    # Add unique links
-                    for link in links:
-                        link_id = link.get('id')
-                        if link_id and link_id not in seen_links:
-                            seen_links.add(link_id)
-                            all_links.append(link)
-                except Exception:
+            # The combinations are independent, so issue them concurrently and
+            # merge in submission order to keep the result order deterministic
+            if len(endpoints) == 1:
+                results = [self._request_or_error(endpoints[0])]
+            else:
+                executor = self._get_executor()
+                futures = [executor.submit(self._request_or_error, endpoint) for endpoint in endpoints]
+                results = [future.result() for future in futures]
+
+            errors = [result for result in results if isinstance(result, APIRequestError)]
+            if errors and len(errors) == len(results):
+                # Every request failed - report it rather than showing "no results"
+                self._handle_request_error(errors[0])
+            search_failed = bool(errors)
+
+            # Ordered dict keyed by link id: keeps first-seen order and drops duplicates
+            unique_links = {}
+            for result in results:
+                if isinstance(result, APIRequestError):
                     continue  # Skip failed requests
 
+                # Add unique links
+                for link in result.get('response', []):
+                    link_id = link.get('id')
+                    if link_id:
+                        unique_links.setdefault(link_id, link)
+            all_links = list(unique_links.values())
+
         else:
             # No specific filters, do a general search
-            params = {}
+            try:
+                all_links = self._fetch_links(self._links_endpoint(query), limit)
+            except APIRequestError as e:
+                self._handle_request_error(e)
 
-            if query:
-                params['searchQueryString'] = query
-                params['searchByName'] = 'true'
-                params['searchByUrl'] = 'true'
-                params['searchByDescription'] = 'true'
-                params['searchByTextContent'] = 'true'
-                params['searchByTags'] = 'true'
+        if not all_links and not search_failed:
+            self.cache.set(empty_key, searched_at, NEGATIVE_SEARCH_TTL)
 
-            params['sort'] = 'createdAt'
-            params['cursor'] = '0'
+        return all_links[:limit]
 
-            query_string = urllib.parse.urlencode(params)
-            endpoint = f"/links?{query_string}"
+    def _negative_searches_invalidated_at(self) -> int:
+        """When remembered empty searches were last invalidated (time_ns, 0 if never)"""
+        invalidated_at, hit = self.cache.get(f"search_invalidated_{self._cache_key_suffix}")
+        return invalidated_at if hit else 0
+
+    def _invalidate_negative_searches(self):
+        """Forget all searches remembered as empty, e.g. after saving a link"""
+        # Kept well past NEGATIVE_SEARCH_TTL so it outlives every entry it retires
+        self.cache.set(f"search_invalidated_{self._cache_key_suffix}",
+                       time.time_ns(), ttl_seconds=STALE_GRACE_SECONDS)
+
+    def _links_endpoint(self, query: str = "", collection_id: Optional[str] = None,
+                        tag_id: Optional[str] = None) -> str:
+        """Build the /links search endpoint for a query and optional single filters"""
+        params = {}
+
+        if query:
+            params['searchQueryString'] = query
+            params['searchByName'] = 'true'
+            params['searchByUrl'] = 'true'
+            params['searchByDescription'] = 'true'
+            params['searchByTextContent'] = 'true'
+            params['searchByTags'] = 'true'
 
-            response = self._make_request(endpoint)
-            all_links = response.get('response', [])
+        if collection_id:
+            params['collectionId'] = collection_id
+        if tag_id:
+            params['tagId'] = tag_id
 
-        return all_links[:limit]
+        params['sort'] = 'createdAt'
+        params['cursor'] = '0'
+
+        return f"/links?{urllib.parse.urlencode(params)}"
 
     def get_collections(self) -> List[Dict]:
         """Get all collections with caching support"""
-        cache_key = f"collections_{self.api_url}_{hash(self.api_token) % 10000}"
+        cache_key = self._cache_key_collections
 
-        # Try to get from cache first
-        cached_collections, cache_hit = self.cache.get(cache_key)
+        # Try to get from cache first; an expired copy is still served while
+        # a background process fetches a fresh one
+        cached_collections, cache_hit, stale = self.cache.get_stale(cache_key, STALE_GRACE_SECONDS)
         if cache_hit:
-            print(f"Collections cache HIT ({len(cached_collections)} collections)", file=sys.stderr)
+            self._log(f"Collections cache HIT ({len(cached_collections)} collections{', stale' if stale else ''})")
+            if stale:
+                self._refresh_in_background('collections')
             return cached_collections
 
-        print(f"Collections cache MISS - fetching from API", file=sys.stderr)
+        self._log(f"Collections cache MISS - fetching from API")
 
         # Not in cache, fetch from API
         response = self._make_request('/collections')
         collections = response.get('response', [])
+        self._cache_collections(cache_key, collections)
 
-        # Cache the result using configured TTL
-        if collections:
+        return collections
+
+    def _cache_collections(self, cache_key: str, collections: List[Dict], allow_empty: bool = False):
+        """Cache the collection list using the configured TTL (an empty list only if allow_empty)"""
+        if collections or allow_empty:
             self.cache.set(cache_key, collections, ttl_seconds=self.cache_ttl_collections)
             ttl_minutes = self.cache_ttl_collections // 60
-            print(f"Cached {len(collections)} collections for {ttl_minutes}m ({self.cache_ttl_collections}s)", file=sys.stderr)
-
-        return collections
+            self._log(f"Cached {len(collections)} collections for {ttl_minutes}m ({self.cache_ttl_collections}s)")
 
     def get_links_by_collection(self, collection_id: str, limit: int = 20) -> List[Dict]:
         """Get links within a specific collection"""
         return self.search_links(collection_id=collection_id, limit=limit)
 
+    def get_collections_and_links(self, collection_id: str, limit: int = 20) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Get all collections together with the links of one collection.
+
+        The links request is started on the thread pool before the collection
+        list is looked up, so a cold collections cache doesn't add a second
+        round-trip. The cache is only touched from the calling thread.
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: (collections, links in the collection)
+        """
+        links_future = self._get_executor().submit(
+            self._fetch_links_or_error, self._links_endpoint(collection_id=collection_id), limit
+        )
+        collections = self.get_collections()
+
+        links = links_future.result()
+        if isinstance(links, APIRequestError):
+            self._handle_request_error(links)
+        return collections, links
+
+    def get_links_by_collections(self, collection_ids: List[str], limit: int = 20) -> Dict[str, List[Dict]]:
+        """
+        Get links for several collections at once.
+
+        The per-collection requests are issued concurrently, so the wall time
+        is about one round-trip regardless of how many collections are asked for.
+
+        Returns:
+            Dict[str, List[Dict]]: Links keyed by collection ID; a collection whose
+            request failed maps to an empty list
+        """
+        collection_ids = list(dict.fromkeys(collection_ids))
+        if not collection_ids:
+            return {}
+
+        endpoints = [self._links_endpoint(collection_id=collection_id) for collection_id in collection_ids]
+        if len(endpoints) == 1:
+            results = [self._fetch_links_or_error(endpoints[0], limit)]
+        else:
+            executor = self._get_executor()
+            results = list(executor.map(self._fetch_links_or_error, endpoints, [limit] * len(endpoints)))
+
+        errors = [result for result in results if isinstance(result, APIRequestError)]
+        if len(errors) == len(results):
+            # Every request failed - report it rather than showing empty collections
+            self._handle_request_error(errors[0])
+
+        links_by_collection = {}
+        for collection_id, result in zip(collection_ids, results):
+            if isinstance(result, APIRequestError):
+                links_by_collection[collection_id] = []
+            else:
+                links_by_collection[collection_id] = result
+        return links_by_collection
+
     def get_tags(self) -> List[Dict]:
         """Get all available tags with caching support"""
-        cache_key = f"tags_{self.api_url}_{hash(self.api_token) % 10000}"
+        cache_key = self._cache_key_tags
 
-        # Try to get from cache first
-        cached_tags, cache_hit = self.cache.get(cache_key)
+        # Try to get from cache first; an expired copy is still served while
+        # a background process fetches a fresh one
+        cached_tags, cache_hit, stale = self.cache.get_stale(cache_key, STALE_GRACE_SECONDS)
         if cache_hit:
-            print(f"Tags cache HIT ({len(cached_tags)} tags)", file=sys.stderr)
+            self._log(f"Tags cache HIT ({len(cached_tags)} tags{', stale' if stale else ''})")
+            if stale:
+                self._refresh_in_background('tags')
             return cached_tags
 
-        print(f"Tags cache MISS - fetching from API", file=sys.stderr)
+        self._log(f"Tags cache MISS - fetching from API")
 
         # Not in cache, fetch from API
         response = self._make_request('/tags')
         tags = response.get('response', [])
+        self._cache_tags(cache_key, tags)
 
-        # Cache the result using configured TTL
-        if tags:
+        return tags
+
+    def _cache_tags(self, cache_key: str, tags: List[Dict], allow_empty: bool = False):
+        """Cache the tag list using the configured TTL (an empty list only if allow_empty)"""
+        if tags or allow_empty:
             self.cache.set(cache_key, tags, ttl_seconds=self.cache_ttl_tags)
             ttl_minutes = self.cache_ttl_tags // 60
-            print(f"Cached {len(tags)} tags for {ttl_minutes}m ({self.cache_ttl_tags}s)", file=sys.stderr)
+            self._log(f"Cached {len(tags)} tags for {ttl_minutes}m ({self.cache_ttl_tags}s)")
+
+    def refresh_collections(self) -> List[Dict]:
+        """Fetch collections from the API and replace the cached copy, even if now empty"""
+        collections = self._make_request('/collections').get('response', [])
+        self._cache_collections(self._cache_key_collections, collections, allow_empty=True)
+        return collections
 
+    def refresh_tags(self) -> List[Dict]:
+        """Fetch tags from the API and replace the cached copy, even if now empty"""
+        tags = self._make_request('/tags').get('response', [])
+        self._cache_tags(self._cache_key_tags, tags, allow_empty=True)
         return tags
 
+    def _refresh_in_background(self, kind: str):
+        """
+        Refresh a stale 'tags' or 'collections' cache entry without blocking.
+
+        Alfred waits for the script process to exit, so a background thread
+        would still delay results; the refresh runs in a detached Python
+        process instead. A short-lived cache marker keeps concurrent
+        keystrokes from starting duplicate refreshes.
+        """
+        gate_key = f"refreshing_{kind}_{self._cache_key_suffix}"
+        _, refreshing = self.cache.get(gate_key)
+        if refreshing:
+            return
+        self.cache.set(gate_key, True, ttl_seconds=REFRESH_GATE_SECONDS)
+
+        import subprocess
+
+        code = (
+            "from linkwarden_api import LinkwardenAPI; "
+            f"api = LinkwardenAPI(output_alfred_format=False); api.refresh_{kind}(); "
+            f"api.cache.delete({gate_key!r})"
+        )
+        try:
+            subprocess.Popen(
+                [sys.executable, '-c', code],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+            self._log(f"Started background refresh of {kind}")
+        except OSError as e:
+            print(f"Could not start background refresh of {kind}: {e}", file=sys.stderr)
+
+    def get_tags_and_collections(self) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Get all tags and all collections, fetching both concurrently on a cache miss.
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: (tags, collections)
+        """
+        tags_key = self._cache_key_tags
+        collections_key = self._cache_key_collections
+
+        # Same stale-while-revalidate lookup as get_tags/get_collections, so an
+        # expired list is served at once and refreshed in the background. Both
+        # keys are read in a single cache round trip.
+        cached = self.cache.mget_stale([tags_key, collections_key], STALE_GRACE_SECONDS)
+        for kind, key in (('tags', tags_key), ('collections', collections_key)):
+            if key in cached and cached[key][1]:
+                self._refresh_in_background(kind)
+
+        if tags_key in cached and collections_key in cached:
+            self._log(f"Tags and collections cache HIT")
+            return cached[tags_key][0], cached[collections_key][0]
+        if tags_key in cached:
+            return cached[tags_key][0], self.get_collections()
+        if collections_key in cached:
+            return self.get_tags(), cached[collections_key][0]
+
+        self._log(f"Tags and collections cache MISS - fetching both from API")
+
+        # The two lookups are independent, so fetch tags on the pool while
+        # this thread fetches collections (keeping its connection warm for the
+        # requests that follow). The cache is only touched from this thread.
+        tags_future = self._get_executor().submit(self._request, '/tags')
+        try:
+            collections = self._request('/collections').get('response', [])
+            tags = tags_future.result().get('response', [])
+        except APIRequestError as e:
+            self._handle_request_error(e)
+
+        self._cache_tags(tags_key, tags)
+        self._cache_collections(collections_key, collections)
+
+        return tags, collections
+
+    def _tag_index_for(self, tags: List[Dict]) -> Dict[str, Dict]:
+        """
+        Map lowercased tag names to tag objects.
+
+        The map is rebuilt only when given a different list object than last
+        time, so repeated saves against the same cached tag list reuse it.
+        """
+        if self._tag_index_src is not tags:
+            self._tag_index = {tag['name'].lower(): tag for tag in tags if tag.get('name')}
+            self._tag_index_src = tags
+        return self._tag_index
+
+    def _collection_index_for(self, collections: List[Dict]) -> Dict[str, Dict]:
+        """Map lowercased collection names to collections (first match wins), memoized like _tag_index_for"""
+        if self._collection_index_src is not collections:
+            index = {}
+            for collection in collections:
+                name = collection.get('name')
+                if name:
+                    index.setdefault(name.lower(), collection)
+            self._collection_index = index
+            self._collection_index_src = collections
+        return self._collection_index
+
+    def _create_tags(self, names: List[str], existing_tags: List[Dict]) -> List[Dict]:
+        """
+        Create several tags with a single POST /tags request.
+
+        The created tags are merged into the cached tag list so they are known
+        locally right away. Servers without bulk tag creation are remembered
+        and left to create tags inline with the link, as before.
+
+        Returns:
+            List[Dict]: The created tags, or an empty list if none were created
+        """
+        unsupported_key = f"tags_bulk_unsupported_{self._cache_key_suffix}"
+        _, unsupported = self.cache.get(unsupported_key)
+        if unsupported:
+            return []
+
+        try:
+            result = self._request('/tags', 'POST', {"tags": [{"label": name} for name in names]})
+        except APIRequestError as e:
+            if e.status in (404, 405):
+                self.cache.set(unsupported_key, True, ttl_seconds=BULK_TAGS_UNSUPPORTED_TTL)
+            self._log(f"Bulk tag creation unavailable, creating tags with the link: {e}")
+            return []
+
+        created = result.get('response') if isinstance(result, dict) else None
+        if not isinstance(created, list):
+            return []
+        created = [tag for tag in created if isinstance(tag, dict) and tag.get('id') and tag.get('name')]
+
+        if created:
+            self._cache_tags(self._cache_key_tags, existing_tags + created)
+            self._log(f"Created {len(created)} tag(s) in one request")
+        return created
+
     def create_collection(self, name: str, description: str = "") -> Dict:
-        """Create a new collection and invalidate cache"""
+        """Create a new collection and add it to the cached collection list"""
         data = {
             "name": name,
             "description": description
         }
         result = self._make_request('/collections', 'POST', data)
+        self._invalidate_negative_searches()
 
-        # Invalidate collections cache since we added a new collection
-        cache_key = f"collections_{self.api_url}_{hash(self.api_token) % 10000}"
-        self.cache.delete(cache_key)
-        print(f"Invalidated collections cache after creating new collection", file=sys.stderr)
+        # Write the new collection through to the cache so the next lookup
+        # doesn't have to refetch the whole list. A new list is stored since
+        # callers may still hold the cached one.
+        cache_key = self._cache_key_collections
+        new_collection = result.get('response') if isinstance(result, dict) else None
+        cached_collections, cache_hit = self.cache.get(cache_key)
+        if cache_hit and isinstance(new_collection, dict) and 'id' in new_collection:
+            self._cache_collections(cache_key, cached_collections + [new_collection])
+            self._log(f"Added new collection to collections cache")
+        else:
+            self.cache.delete(cache_key)
+            self._log(f"Invalidated collections cache after creating new collection")
 
         return result
 
@@ -387,13 +999,13 @@ class LinkwardenAPI:
         """
         Create a new link in Linkwarden with tags and collection assignment.
 
-        This method implements a two-step process to work around a known Linkwarden API bug
-        where specifying collectionId in POST requests is ignored, causing links to be
-        saved to the "Unorganized" collection instead.
+        This method works around a known Linkwarden API bug where specifying collectionId
+        in POST requests is ignored on some versions, causing links to be saved to the
+        "Unorganized" collection instead.
 
         Workaround Process:
-        1. Create link without collection (POST /api/v1/links)
-        2. Update link to assign correct collection (PUT /api/v1/links/{id})
+        1. Create link with the collection (POST /api/v1/links); done if the server honoured it
+        2. Otherwise update link to assign correct collection (PUT /api/v1/links/{id})
 
         Args:
             url (str): URL to save
@@ -409,17 +1021,50 @@ class LinkwardenAPI:
             Tags are converted to objects with IDs for existing tags, or name-only objects
             for new tags (which Linkwarden will automatically create).
         """
+        try:
+            return self._create_link(url, name, description, tags, collection_name)
+        finally:
+            # The new link may match searches remembered as empty
+            self._invalidate_negative_searches()
+
+    def _create_link(self, url: str, name: str, description: str,
+                     tags: Optional[List[str]], collection_name: str) -> Dict:
+        """Create the link; see create_link"""
         if tags is None:
             tags = []
 
+        # Look up existing tags and collections up front so both lists are
+        # fetched in one concurrent round-trip when neither is cached
+        existing_tags = existing_collections = None
+        prefetch_error = None
+        try:
+            if tags and collection_name:
+                existing_tags, existing_collections = self.get_tags_and_collections()
+            elif tags:
+                existing_tags = self.get_tags()
+            elif collection_name:
+                existing_collections = self.get_collections()
+        except Exception as e:
+            prefetch_error = e
+
         # Convert tag names to tag objects that Linkwarden expects
         tag_objects = []
         if tags:
-            print(f"Processing tags: {tags}", file=sys.stderr)
+            self._log(f"Processing tags: {tags}")
             try:
-                # Get existing tags to find IDs, or create new ones
-                existing_tags = self.get_tags()
-                existing_tag_map = {tag.get('name', '').lower(): tag for tag in existing_tags}
+                # Use existing tags to find IDs, or create new ones
+                if prefetch_error:
+                    raise prefetch_error
+                existing_tag_map = self._tag_index_for(existing_tags)
+
+                new_tag_names = [tag_name for tag_name in tags if tag_name.lower() not in existing_tag_map]
+                created_tag_map = {}
+                if new_tag_names:
+                    # A local map: routing this one-off list through
+                    # _tag_index_for would evict the memoized index
+                    created_tag_map = {tag['name'].lower(): tag
+                                       for tag in self._create_tags(new_tag_names, existing_tags)
+                                       if tag.get('name')}
 
                 existing_count = 0
                 new_count = 0
@@ -430,15 +1075,19 @@ class LinkwardenAPI:
                         # Use existing tag
                         tag_objects.append(existing_tag_map[tag_name_lower])
                         existing_count += 1
+                    elif tag_name_lower in created_tag_map:
+                        # Use tag created ahead of the link
+                        tag_objects.append(created_tag_map[tag_name_lower])
+                        new_count += 1
                     else:
                         # Create new tag object (Linkwarden will auto-create it)
                         tag_objects.append({"name": tag_name})
                         new_count += 1
 
                 if existing_count > 0:
-                    print(f"Using {existing_count} existing tag(s)", file=sys.stderr)
+                    self._log(f"Using {existing_count} existing tag(s)")
                 if new_count > 0:
-                    print(f"Creating {new_count} new tag(s)", file=sys.stderr)
+                    self._log(f"Creating {new_count} new tag(s)")
 
             except Exception as e:
                 print(f"Error processing tags, using new tag objects: {e}", file=sys.stderr)
@@ -455,39 +1104,38 @@ class LinkwardenAPI:
 
         # Handle collection assignment
         if collection_name:
-            print(f"Processing collection: '{collection_name}'", file=sys.stderr)
+            self._log(f"Processing collection: '{collection_name}'")
             # Try to find the collection ID first
             try:
-                print(f"Fetching existing collections...", file=sys.stderr)
-                collections = self.get_collections()
-                print(f"Found {len(collections)} existing collections", file=sys.stderr)
+                if prefetch_error:
+                    raise prefetch_error
+                collections = existing_collections
+                self._log(f"Found {len(collections)} existing collections")
 
                 collection_id = None
-                for collection in collections:
-                    existing_name = collection.get('name', '')
-                    print(f"   - Checking: '{existing_name}' vs '{collection_name}'", file=sys.stderr)
-                    if existing_name.lower() == collection_name.lower():
-                        collection_id = collection.get('id')
-                        print(f"Found matching collection: '{existing_name}' (ID: {collection_id})", file=sys.stderr)
-                        break
+                collection = self._collection_index_for(collections).get(collection_name.lower())
+                if collection:
+                    collection_id = collection.get('id')
+                    self._log(f"Found matching collection: '{collection.get('name', '')}' (ID: {collection_id})")
 
                 if collection_id:
                     # Use existing collection by ID
                     data["collectionId"] = collection_id
-                    print(f"Using existing collection: {collection_name} (ID: {collection_id})", file=sys.stderr)
+                    self._log(f"Using existing collection: {collection_name} (ID: {collection_id})")
                 else:
                     # Collection doesn't exist - create new one
-                    print(f"Collection '{collection_name}' not found, creating new one...", file=sys.stderr)
+                    self._log(f"Collection '{collection_name}' not found, creating new one...")
                     try:
                         new_collection = self.create_collection(collection_name)
-                        print(f"Create collection response: {json.dumps(new_collection, indent=2)}", file=sys.stderr)
+                        if self._debug:
+                            print(f"Create collection response: {json.dumps(new_collection, indent=2)}", file=sys.stderr)
 
                         if new_collection and 'response' in new_collection:
                             response = new_collection['response']
                             if isinstance(response, dict) and 'id' in response:
                                 collection_id = response['id']
                                 data["collectionId"] = collection_id
-                                print(f"Created new collection: {collection_name} (ID: {collection_id})", file=sys.stderr)
+                                self._log(f"Created new collection: {collection_name} (ID: {collection_id})")
                             else:
                                 print(f"Unexpected response format from collection creation", file=sys.stderr)
                                 print(f"   Response: {response}", file=sys.stderr)
@@ -501,38 +1149,66 @@ class LinkwardenAPI:
                 print(f"Error handling collection '{collection_name}': {e}", file=sys.stderr)
                 print("   Link will be saved to default collection", file=sys.stderr)
         else:
-            print(f"No collection specified, using default", file=sys.stderr)
+            self._log(f"No collection specified, using default")
 
-        print(f"Final API request data:", file=sys.stderr)
-        print(json.dumps(data, indent=2), file=sys.stderr)
+        if self._debug:
+            print(f"Final API request data:", file=sys.stderr)
+            print(json.dumps(data, indent=2), file=sys.stderr)
 
         # WORKAROUND: Two-step approach to bypass Linkwarden API collection assignment bug
         #
-        # Issue: When creating links with collectionId in POST /api/v1/links, the API ignores
-        # the collectionId parameter and always saves to "Unorganized" collection.
+        # Issue: When creating links with collectionId in POST /api/v1/links, some Linkwarden
+        # versions ignore the collectionId parameter and always save to "Unorganized" collection.
         #
-        # Solution: Create link without collection first, then update with PUT to assign collection.
-        # This ensures proper collection assignment while maintaining tag functionality.
+        # Solution: Send the collection with the POST and check where the link ended up. If the
+        # server ignored it, update with PUT to assign collection. Servers that honour it need
+        # only the one request. Servers that reject it are remembered and get the original
+        # create-without-collection-then-PUT sequence.
         if collection_name and data.get('collectionId'):
             intended_collection_id = data.get('collectionId')
-            print(f"Using two-step approach to bypass API bug", file=sys.stderr)
+            post_unsupported_key = f"collection_post_unsupported_{self._cache_key_suffix}"
+            _, post_unsupported = self.cache.get(post_unsupported_key)
+
+            result = None
+            if not post_unsupported:
+                data_with_collection = data.copy()
+                data_with_collection["collection"] = {"id": intended_collection_id, "name": collection_name}
+                self._log(f"Creating link in collection {intended_collection_id}")
+                try:
+                    result = self._request('/links', 'POST', data_with_collection)
+                except APIRequestError as e:
+                    # Only a 400 about the collection fields means the server
+                    # rejects them; anything else (bad URL, payload) is a real error
+                    if e.status != 400 or 'collection' not in str(e).lower():
+                        self._handle_request_error(e)
+                    self.cache.set(post_unsupported_key, True, ttl_seconds=COLLECTION_POST_UNSUPPORTED_TTL)
+                    self._log(f"Server rejected collection on create, using two-step approach")
+                else:
+                    saved_link = (result or {}).get('response') or {}
+                    if (saved_link.get('collection') or {}).get('id') == intended_collection_id:
+                        self._log(f"Collection assignment successful")
+                        return result
+                    self._log(f"Server ignored the collection, assigning it with PUT")
+
+            if result is None:
+                self._log(f"Using two-step approach to bypass API bug")
 
-            # Step 1: Create link without collection (avoids the API bug)
-            data_without_collection = data.copy()
-            data_without_collection.pop('collectionId', None)
-            print(f"Step 1: Creating link without collection", file=sys.stderr)
+                # Step 1: Create link without collection (avoids the API bug)
+                data_without_collection = data.copy()
+                data_without_collection.pop('collectionId', None)
+                self._log(f"Step 1: Creating link without collection")
 
-            result = self._make_request('/links', 'POST', data_without_collection)
+                result = self._make_request('/links', 'POST', data_without_collection)
 
             if result and 'response' in result:
                 link_id = result['response'].get('id')
-                print(f"Link created (ID: {link_id})", file=sys.stderr)
+                self._log(f"Link created (ID: {link_id})")
 
                 # Step 2: Use PUT with all required fields to assign collection
                 #
                 # The PUT endpoint requires specific fields including ownerId and collection object.
                 # We extract these from the created link and build a complete update request.
-                print(f"Step 2: Using PUT to assign collection {intended_collection_id}", file=sys.stderr)
+                self._log(f"Step 2: Using PUT to assign collection {intended_collection_id}")
 
                 # Get the current link data and include all required fields for PUT
                 saved_link = result['response']
@@ -560,7 +1236,7 @@ class LinkwardenAPI:
                     if updated_result and 'response' in updated_result:
                         final_collection_id = updated_result['response'].get('collection', {}).get('id')
                         if final_collection_id == intended_collection_id:
-                            print(f"Collection assignment successful", file=sys.stderr)
+                            self._log(f"Collection assignment successful")
                             return updated_result
                         else:
                             print(f"Collection update didn't stick, still in collection {final_collection_id}", file=sys.stderr)
@@ -578,7 +1254,7 @@ class LinkwardenAPI:
                 return result
         else:
             # No collection specified, use standard approach
-            print(f"Creating link without collection", file=sys.stderr)
+            self._log(f"Creating link without collection")
             result = self._make_request('/links', 'POST', data)
 
         return result
@@ -592,23 +1268,32 @@ class LinkwardenAPI:
                 "icon": {"path": "icon.png"}
             }]
         }
-        print(json.dumps(error_output))
+        _write_json(error_output)
 
 
 def output_alfred_items(items: List[Dict]):
     """Output items in Alfred JSON format"""
     alfred_items = {"items": items}
-    print(json.dumps(alfred_items, ensure_ascii=False))
+    _write_json(alfred_items)
+
+
+# Icon objects shared by every item using the same icon; they are only read
+# when the items are serialized
+_ICONS: Dict[str, Dict[str, str]] = {}
 
 
 def create_alfred_item(title: str, subtitle: str, arg: str, icon: str = "icon.png",
                       autocomplete: str = None, valid: bool = True) -> Dict:
     """Create a single Alfred item"""
+    icon_obj = _ICONS.get(icon)
+    if icon_obj is None:
+        icon_obj = _ICONS[icon] = {"path": icon}
+
     item = {
         "title": title,
         "subtitle": subtitle,
         "arg": arg,
-        "icon": {"path": icon},
+        "icon": icon_obj,
         "valid": valid
     }
 
@@ -625,44 +1310,71 @@ def truncate_text(text: str, max_length: int = 100) -> str:
     return text[:max_length-3] + "..."
 
 
-def parse_search_query(query: str) -> Dict[str, Any]:
-    """Parse search query for special filters like #tag, @collection, and tag:/collection:"""
-    import re
+def first_tag_names(tags: List[Dict], max_names: int = 3) -> Tuple[List[str], int]:
+    """
+    Get the first max_names tag names for display, in one pass.
 
-    # Extract tags using # syntax
-    tag_matches = re.findall(r'#(\w+)', query)
+    Returns:
+        Tuple[List[str], int]: (shown names, number of further named tags)
+    """
+    names = []
+    extra = 0
+    for tag in tags:
+        name = tag.get('name')
+        if not name:
+            continue
+        if len(names) < max_names:
+            names.append(name)
+        else:
+            extra += 1
+    return names, extra
+
+
+def split_query(query: str) -> Tuple[List[str], List[str], List[str]]:
+    """Split a query into #tag names, @collection names and the remaining text tokens"""
+    tags = []
+    collections = []
+    text = []
+
+    # Classify each token in a single scan
+    for match in _QUERY_TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if not value:
+            continue
+        if kind == 'tag':
+            tags.append(value)
+        elif kind == 'col':
+            collections.append(value)
+        else:
+            text.append(value)
 
-    # Extract collections using @ syntax
-    collection_matches = re.findall(r'@(\w+)', query)
+    return tags, collections, text
 
-    # Remove # and @ patterns from query for text search
-    clean_query = re.sub(r'#\w+', '', query)
-    clean_query = re.sub(r'@\w+', '', clean_query)
 
-    # Also handle legacy tag: and collection: syntax
-    parts = clean_query.split()
+def parse_search_query(query: str) -> Dict[str, Any]:
+    """Parse search query for special filters like #tag, @collection, and tag:/collection:"""
+    tag_matches, collection_matches, parts = split_query(query)
     search_terms = []
-    legacy_filters = {}
 
     for part in parts:
         if ':' in part and not part.startswith('http'):
+            # Legacy tag: and collection: syntax; an empty value is ignored
             key, value = part.split(':', 1)
-            if key.lower() in ['tag', 'collection', 'col']:
-                if key.lower() == 'tag':
-                    tag_matches.append(value)
-                elif key.lower() in ['collection', 'col']:
-                    collection_matches.append(value)
+            key = key.lower()
+            if not value:
+                continue
+            if key == 'tag':
+                tag_matches.append(value)
+            elif key in ('collection', 'col'):
+                collection_matches.append(value)
         else:
             search_terms.append(part)
 
-    # Clean up the text query
-    text_query = ' '.join(search_terms).strip()
-    text_query = re.sub(r'\s+', ' ', text_query)  # Remove extra spaces
-
     return {
-        'query': text_query,
-        'tags': list(set(tag_matches)),  # Remove duplicates
-        'collections': list(set(collection_matches)),  # Remove duplicates
+        'query': ' '.join(search_terms),
+        'tags': list(dict.fromkeys(tag_matches)),  # Remove duplicates, keep order
+        'collections': list(dict.fromkeys(collection_matches)),  # Remove duplicates, keep order
         'tag': tag_matches[0] if tag_matches else '',  # For backwards compatibility
         'collection': collection_matches[0] if collection_matches else ''  # For backwards compatibility
-    }
\ No newline at end of file
+    }
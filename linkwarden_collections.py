@@ -8,7 +8,7 @@ import sys
 import os
 import json
 from urllib.parse import quote
-from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item, truncate_text
+from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item, truncate_text, first_tag_names
 
 
 def format_collection_item(collection: dict) -> dict:
@@ -64,11 +64,11 @@ def format_link_item_in_collection(link: dict, collection_name: str) -> dict:
     # Add tags
     tags = link.get('tags', [])
     if tags:
-        tag_names = [tag.get('name', '') for tag in tags if tag.get('name')]
+        tag_names, extra_tags = first_tag_names(tags)  # Show max 3 tags
         if tag_names:
-            tags_str = ', '.join(tag_names[:3])  # Show max 3 tags
-            if len(tag_names) > 3:
-                tags_str += f' (+{len(tag_names) - 3} more)'
+            tags_str = ', '.join(tag_names)
+            if extra_tags:
+                tags_str += f' (+{extra_tags} more)'
             subtitle_parts.append(f"{tags_str}")
 
     subtitle = ' • '.join(subtitle_parts) if subtitle_parts else f"Link in {collection_name}"
@@ -104,16 +104,11 @@ def main():
         if is_collection_browse and collection_id:
             # Show links within the specific collection
             try:
-                # Get collection details
-                collections = api.get_collections()
-                collection_name = "Unknown Collection"
-                for col in collections:
-                    if str(col.get('id')) == collection_id:
-                        collection_name = col.get('name', 'Unknown Collection')
-                        break
-
-                # Get links in this collection
-                links = api.get_links_by_collection(collection_id, limit=20)
+                # Get collection details and the links in this collection
+                # (fetched concurrently; the collection list is usually cached)
+                collections, links = api.get_collections_and_links(collection_id, limit=20)
+                id_to_name = {str(col.get('id')): col.get('name', 'Unknown Collection') for col in collections}
+                collection_name = id_to_name.get(collection_id, "Unknown Collection")
 
                 if not links:
                     no_links_item = create_alfred_item(
@@ -168,14 +163,14 @@ def main():
 
             # Filter collections if query is provided
             if query.strip():
-                query_lower = query.lower()
-                filtered_collections = []
-                for collection in collections:
-                    name = collection.get('name', '').lower()
-                    description = collection.get('description', '').lower()
-                    if query_lower in name or query_lower in description:
-                        filtered_collections.append(collection)
-                collections = filtered_collections
+                query_folded = query.strip().casefold()
+                # The name is checked first so the (often long) description
+                # is only case-folded when the name doesn't match
+                collections = [
+                    collection for collection in collections
+                    if query_folded in (collection.get('name') or '').casefold()
+                    or query_folded in (collection.get('description') or '').casefold()
+                ]
 
             if not collections:
                 no_match_item = create_alfred_item(
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Refresh cached collections and tags - Alfred Action Script
+Command: lwr
+
+Searches resolve #tag and @collection names from the cached lists, which are
+refreshed in the background once they expire; they only wait on the API when
+the cache is cold or a list is more than a day past its TTL. Run this after
+renaming, adding or deleting collections/tags in Linkwarden, or bind it to a
+hotkey/schedule, to update the lists out-of-band.
+"""
+
+import sys
+from linkwarden_api import LinkwardenAPI
+
+
+def main():
+    try:
+        # Initialize API (don't output Alfred JSON format)
+        api = LinkwardenAPI(output_alfred_format=False)
+
+        print("Refreshing collections...", file=sys.stderr)
+        collections = api.refresh_collections()
+
+        print("Refreshing tags...", file=sys.stderr)
+        tags = api.refresh_tags()
+
+        # Output notification text for Alfred's built-in notification
+        print(f"{len(collections)} collections and {len(tags)} tags cached")
+
+    except Exception as e:
+        error_msg = f"Failed to refresh cache: {str(e)}"
+        print(error_msg, file=sys.stderr)
+        print(f"Refresh Failed\n{error_msg}")
+
+
+if __name__ == "__main__":
+    main()
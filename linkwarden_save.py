@@ -6,10 +6,15 @@ Command: lws [url]
 
 import sys
 import os
-import re
-import json
 from urllib.parse import urlparse
-from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item
+from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item, split_query
+
+# Separates the fields of the save_enhanced: arg handed to the save action.
+# Tag and collection names are whitespace-free tokens, so they never contain it.
+ARG_SEPARATOR = '\x1f'
+
+
+_URL_SCHEMES = ('http://', 'https://', 'ftp://')
 
 
 def normalize_url(url: str) -> str:
@@ -19,7 +24,7 @@ def normalize_url(url: str) -> str:
         return url
 
     # If it already has a scheme, return as-is
-    if url.startswith(('http://', 'https://', 'ftp://')):
+    if url.startswith(_URL_SCHEMES):
         return url
 
     # If it looks like a URL (has dots), add https://
@@ -29,48 +34,51 @@ def normalize_url(url: str) -> str:
     return url
 
 
-def is_valid_url(url: str) -> bool:
-    """Check if the provided string is a valid URL (with auto-normalization)"""
-    try:
-        normalized = normalize_url(url)
-        result = urlparse(normalized)
-        return all([result.scheme, result.netloc])
-    except:
-        return False
+def _fast_host(url: str) -> str:
+    """Return the host of a normalized http(s)/ftp URL without urlparse, or '' if unsure"""
+    if not url.startswith(_URL_SCHEMES) or ' ' in url:
+        return ''
+    rest = url[url.index('://') + 3:]
+    end = len(rest)
+    for sep in '/?#':
+        pos = rest.find(sep, 0, end)
+        if pos != -1:
+            end = pos
+    host = rest[:end]
+    # Hosts like localhost:3000 or user@host are left to urlparse
+    return host if '.' in host and '@' not in host else ''
 
 
 def extract_domain(url: str) -> str:
-    """Extract domain from URL for display"""
+    """Extract domain from URL for display ('' if it isn't a valid URL)"""
+    normalized = normalize_url(url)
+    host = _fast_host(normalized)
+    if host:
+        return host
     try:
-        normalized = normalize_url(url)
         parsed = urlparse(normalized)
-        return parsed.netloc
+        return parsed.netloc if parsed.scheme else ''
     except:
-        return url
+        return ''
 
 
-def parse_save_query(query: str) -> dict:
-    """Parse save query for URL, tags (#), and collections (@)"""
-    import re
-
-    # Extract tags using # syntax
-    tag_matches = re.findall(r'#(\w+)', query)
+def is_valid_url(url: str) -> bool:
+    """Check if the provided string is a valid URL (with auto-normalization)"""
+    return bool(extract_domain(url))
 
-    # Extract collections using @ syntax
-    collection_matches = re.findall(r'@(\w+)', query)
 
-    # Remove # and @ patterns from query to get the URL
-    clean_query = re.sub(r'#\w+', '', query)
-    clean_query = re.sub(r'@\w+', '', clean_query)
-    clean_query = clean_query.strip()
+def parse_save_query(query: str) -> dict:
+    """Parse save query for URL, tags (#), and collections (@)"""
+    # Same #tag/@collection rules as the lw search
+    tag_matches, collection_matches, url_parts = split_query(query)
 
     # The remaining text should be the URL
-    url = normalize_url(clean_query)
+    url = normalize_url(' '.join(url_parts))
 
     return {
         'url': url,
-        'tags': list(set(tag_matches)),  # Remove duplicates
-        'collections': list(set(collection_matches))  # Remove duplicates
+        'tags': list(dict.fromkeys(tag_matches)),  # Remove duplicates, keep order
+        'collections': list(dict.fromkeys(collection_matches))  # Remove duplicates, keep order
     }
 
 
@@ -110,9 +118,10 @@ def main():
         tags = parsed['tags']
         collections = parsed['collections']
 
-        # Check if we have a valid URL
-        if is_valid_url(url):
-            domain = extract_domain(url)
+        # Check if we have a valid URL; the domain doubles as the check, so
+        # the URL is parsed just once for both validation and display
+        domain = extract_domain(url)
+        if domain:
 
             # Build subtitle showing what will be saved
             subtitle_parts = [f"URL: {url}"]
@@ -126,14 +135,10 @@ def main():
             subtitle_parts.append("Press Enter to save")
             subtitle = " • ".join(subtitle_parts)
 
-            # Create save data string to pass to action
-            save_data = {
-                'url': url,
-                'tags': tags,
-                'collections': collections
-            }
-            import json
-            save_arg = f"save_enhanced:{json.dumps(save_data)}"
+            # Create save data string to pass to action: URL, tags and
+            # collections separated by ASCII unit separators (see
+            # extract_save_data_from_arg in linkwarden_save_action.py)
+            save_arg = f"save_enhanced:{url}{ARG_SEPARATOR}{','.join(tags)}{ARG_SEPARATOR}{','.join(collections)}"
 
             alfred_items = [
                 create_alfred_item(
@@ -8,20 +8,44 @@ import sys
 import os
 import json
 import re
+import hashlib
+import subprocess
 from urllib.parse import urlparse
 from linkwarden_api import LinkwardenAPI
 
+# Matched against the raw page bytes so only the title itself is decoded
+_TITLE_RE = re.compile(rb'<title[^>]*>([^<]+)</title>', re.IGNORECASE)
+_HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# The title lives in <head>, so only the start of the page is read
+TITLE_READ_CHUNK = 4096
+TITLE_READ_LIMIT = 64 * 1024
+
+# Separates URL, tags and collections in the save_enhanced: arg
+ARG_SEPARATOR = '\x1f'
+
+# Fetched titles are reused when the same URL is saved again (e.g. a retry)
+TITLE_CACHE_TTL = 86400
+
 
 def extract_save_data_from_arg(arg: str) -> dict:
     """Extract save data from the argument passed from the script filter"""
-    import json
-
     if arg.startswith('save_enhanced:'):
-        try:
-            json_str = arg.replace('save_enhanced:', '')
-            return json.loads(json_str)
-        except:
-            return {'url': arg, 'tags': [], 'collections': []}
+        payload = arg[len('save_enhanced:'):]
+        if payload.startswith('{'):
+            # JSON payload from older versions of the script filter
+            try:
+                return json.loads(payload)
+            except:
+                return {'url': arg, 'tags': [], 'collections': []}
+        url, _, rest = payload.partition(ARG_SEPARATOR)
+        tags, _, collections = rest.partition(ARG_SEPARATOR)
+        return {
+            'url': url,
+            'tags': [tag for tag in tags.split(',') if tag],
+            'collections': [col for col in collections.split(',') if col]
+        }
     elif arg.startswith('save_url:'):
         # Legacy format support
         url = arg.replace('save_url:', '')
@@ -31,26 +55,54 @@ def extract_save_data_from_arg(arg: str) -> dict:
         return {'url': arg, 'tags': [], 'collections': []}
 
 
-def get_page_title(url: str) -> str:
-    """Attempt to get page title (basic implementation)"""
+def _title_cache_key(url: str) -> str:
+    """Cache key for a page title, independent of the Linkwarden instance"""
+    return f"page_title_{hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()}"
+
+
+def get_page_title(url: str, cache=None) -> str:
+    """Attempt to get page title (basic implementation)
+
+    When a CacheManager is given, a title fetched in the last day is
+    returned without hitting the network, and new titles are stored in it.
+    """
+    if cache is not None:
+        cached_title, hit = cache.get(_title_cache_key(url))
+        if hit:
+            return cached_title
+
     try:
         import urllib.request
 
         headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            # Servers that honour ranges send no more than we would read anyway
+            'Range': f'bytes=0-{TITLE_READ_LIMIT - 1}'
         }
 
         req = urllib.request.Request(url, headers=headers)
         with urllib.request.urlopen(req, timeout=5) as response:
-            html = response.read().decode('utf-8', errors='ignore')
+            # Read until the title (or the end of <head>) shows up
+            html = bytearray()
+            title_match = None
+            while len(html) < TITLE_READ_LIMIT:
+                chunk = response.read(TITLE_READ_CHUNK)
+                if not chunk:
+                    break
+                html += chunk
+                title_match = _TITLE_RE.search(html)
+                if title_match or _HEAD_END_RE.search(html):
+                    break
 
             # Simple title extraction
-            title_match = re.search(r'<title[^>]*>([^<]+)</title>', html, re.IGNORECASE)
             if title_match:
-                title = title_match.group(1).strip()
+                title = title_match.group(1).decode('utf-8', errors='ignore').strip()
                 # Clean up title
-                title = re.sub(r'\s+', ' ', title)
-                return title[:200]  # Limit title length
+                title = _WHITESPACE_RE.sub(' ', title)
+                title = title[:200]  # Limit title length
+                if cache is not None:
+                    cache.set(_title_cache_key(url), title, TITLE_CACHE_TTL)
+                return title
 
     except Exception:
         pass
@@ -66,40 +118,23 @@ def get_page_title(url: str) -> str:
 def show_notification(title: str, message: str, sound: bool = True):
     """Show enhanced macOS notification with sound"""
     try:
-        import subprocess
-
-        # Escape quotes and special characters
-        safe_message = message.replace('"', '\\"').replace('\\', '\\\\')
-        safe_title = title.replace('"', '\\"').replace('\\', '\\\\')
+        # Escape backslashes first, then quotes
+        safe_message = message.replace('\\', '\\\\').replace('"', '\\"')
+        safe_title = title.replace('\\', '\\\\').replace('"', '\\"')
 
         # Build AppleScript with sound and subtitle
-        applescript = f'''
-        display notification "{safe_message}" with title "{safe_title}" subtitle "Linkwarden Alfred Workflow"
-        '''
+        applescript = f'display notification "{safe_message}" with title "{safe_title}" subtitle "Linkwarden Alfred Workflow"'
 
         if sound:
             applescript += ' sound name "Glass"'
 
+        # A single osascript call; the sound is part of the same statement
         subprocess.run([
             'osascript', '-e', applescript
         ], check=True, capture_output=True, text=True)
 
         print(f"Notification sent: {title} - {message}")
 
-        # Also try to use the more modern user notification center if available
-        try:
-            import subprocess
-            subprocess.run([
-                'osascript', '-e',
-                f'''
-                set theTitle to "{safe_title}"
-                set theMessage to "{safe_message}"
-                display notification theMessage with title theTitle subtitle "Alfred Workflow" sound name "Glass"
-                '''
-            ], check=False, capture_output=True, text=True, timeout=2)
-        except:
-            pass
-
     except Exception as e:
         print(f"Failed to show notification: {e}")
         print(f"   Title: {title}")
@@ -107,7 +142,6 @@ def show_notification(title: str, message: str, sound: bool = True):
 
         # Fallback: try simpler notification
         try:
-            import subprocess
             subprocess.run([
                 'osascript', '-e',
                 f'display notification "{safe_message}"'
@@ -119,15 +153,12 @@ def show_notification(title: str, message: str, sound: bool = True):
 def get_user_input_for_tags_and_collection(api: LinkwardenAPI, url: str) -> dict:
     """Get user input for tags and collection using Alfred dialogs"""
     try:
-        import subprocess
-
-        # Get available collections for suggestions
-        collections = api.get_collections()
-        collection_names = [col.get('name', '') for col in collections if col.get('name')]
-
-        # Get available tags for suggestions
-        tags = api.get_tags()
-        tag_names = [tag.get('name', '') for tag in tags if tag.get('name')]
+        # Get available tags and collections for suggestions; on a cache miss
+        # both lists are fetched concurrently
+        tags, collections = api.get_tags_and_collections()
+        # One lookup per item; no walrus since the workflow supports Python 3.7
+        collection_names = [name for name in (col.get('name') for col in collections) if name]
+        tag_names = [name for name in (tag.get('name') for tag in tags) if name]
 
         # Simple approach: use AppleScript dialogs
         # In a real implementation, you might want to create a more sophisticated interface
@@ -137,42 +168,31 @@ def get_user_input_for_tags_and_collection(api: LinkwardenAPI, url: str) -> dict
         if tag_names:
             tag_prompt += f"\n\nSuggested tags: {', '.join(tag_names[:10])}"
 
-        tag_script = f'''
-        tell application "System Events"
-            set response to display dialog "{tag_prompt}" default answer "" with title "Add Tags"
-            return text returned of response
-        end tell
-        '''
-
-        try:
-            tag_result = subprocess.run([
-                'osascript', '-e', tag_script
-            ], capture_output=True, text=True, timeout=60)
-
-            entered_tags = tag_result.stdout.strip()
-            tag_list = [tag.strip() for tag in entered_tags.split(',') if tag.strip()] if entered_tags else []
-        except:
-            tag_list = []
-
         # Get collection
         collection_prompt = "Enter collection name (optional):"
         if collection_names:
             collection_prompt += f"\n\nAvailable collections: {', '.join(collection_names[:10])}"
 
-        collection_script = f'''
+        # Show both dialogs from one osascript process; the answers come back
+        # separated by an ASCII unit separator (character id 31)
+        dialog_script = f'''
         tell application "System Events"
-            set response to display dialog "{collection_prompt}" default answer "" with title "Select Collection"
-            return text returned of response
+            set tagResponse to display dialog "{tag_prompt}" default answer "" with title "Add Tags"
+            set collectionResponse to display dialog "{collection_prompt}" default answer "" with title "Select Collection"
+            return (text returned of tagResponse) & (character id 31) & (text returned of collectionResponse)
         end tell
         '''
 
         try:
-            collection_result = subprocess.run([
-                'osascript', '-e', collection_script
-            ], capture_output=True, text=True, timeout=60)
+            dialog_result = subprocess.run([
+                'osascript', '-e', dialog_script
+            ], capture_output=True, text=True, timeout=120)
 
-            collection_name = collection_result.stdout.strip()
+            entered_tags, _, collection_name = dialog_result.stdout.rstrip('\n').partition('\x1f')
+            tag_list = [tag.strip() for tag in entered_tags.split(',') if tag.strip()]
+            collection_name = collection_name.strip()
         except:
+            tag_list = []
             collection_name = ""
 
         return {
@@ -214,7 +234,7 @@ def main():
 
         print("Getting page title...", file=sys.stderr)
         # Get page title
-        title = get_page_title(url)
+        title = get_page_title(url, cache=api.cache)
         print(f"Page title: {title}", file=sys.stderr)
 
         # Determine collection to use (use first one if multiple)
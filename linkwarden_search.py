@@ -23,61 +23,72 @@ Author: joscandreu
 
 import sys
 import os
-from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item, truncate_text, parse_search_query
+from linkwarden_api import LinkwardenAPI, output_alfred_items, create_alfred_item, truncate_text, parse_search_query, first_tag_names
 
+# Maximum number of links shown for a search
+SEARCH_RESULT_LIMIT = 20
+
+
+def _folded_filter(search_filters: dict, name: str) -> frozenset:
+    """Case-folded filter names, using the set precomputed by main() when present"""
+    if not search_filters:
+        return frozenset()
+    folded = search_filters.get(f'_{name}_folded')
+    if folded is None:
+        folded = frozenset(value.casefold() for value in search_filters.get(name) or ())
+    return folded
+
+
+def format_link_item(link: dict, search_filters: dict = None,
+                     _truncate=truncate_text, _create_item=create_alfred_item) -> dict:
+    """Format a link as an Alfred item
+
+    The helpers are bound as defaults so the per-result calls are local
+    lookups rather than global ones.
+    """
+    # Most searches have no #tag filters; skip highlighting then
+    search_tag_names = _folded_filter(search_filters, 'tags')
 
-def format_link_item(link: dict, search_filters: dict = None) -> dict:
-    """Format a link as an Alfred item"""
     title = link.get('name', 'Untitled')
     if not title or title.strip() == '':
-        title = truncate_text(link.get('url', 'Unknown URL'), 60)
+        title = _truncate(link.get('url', 'Unknown URL'), 60)
 
     # Build subtitle with collection and tags info
-    subtitle_parts = []
+    url_text = collection_text = tags_str = ''
 
     # Add URL (truncated)
     url = link.get('url', '')
     if url:
-        subtitle_parts.append(truncate_text(url, 40))
+        url_text = _truncate(url, 40)
 
-    # Add collection info (highlight if it matches search)
+    # Add collection info
     collection = link.get('collection', {})
     if collection and collection.get('name'):
-        collection_name = collection['name']
-        collection_icon = ""
-
-        # Highlight if this collection was searched for
-        if search_filters and search_filters.get('collections'):
-            if collection_name.lower() in [c.lower() for c in search_filters['collections']]:
-                collection_icon = ""
-
-        subtitle_parts.append(f"{collection_name}")
+        collection_text = collection['name']
 
     # Add tags (highlight matching ones)
     tags = link.get('tags', [])
     if tags:
-        tag_names = [tag.get('name', '') for tag in tags if tag.get('name')]
-        if tag_names:
-            # Highlight matching tags
-            highlighted_tags = []
-            search_tag_names = []
-            if search_filters and search_filters.get('tags'):
-                search_tag_names = [t.lower() for t in search_filters['tags']]
-
-            for tag_name in tag_names[:3]:  # Show max 3 tags
-                if tag_name.lower() in search_tag_names:
-                    highlighted_tags.append(f"#{tag_name}")  # Highlight matches
-                else:
-                    highlighted_tags.append(tag_name)
-
-            tags_str = ', '.join(highlighted_tags)
-            if len(tag_names) > 3:
-                tags_str += f' (+{len(tag_names) - 3} more)'
-            subtitle_parts.append(f"{tags_str}")
+        shown_tags, extra_tags = first_tag_names(tags)  # Show max 3 tags
+        if shown_tags:
+            if search_tag_names:
+                # Highlight matching tags
+                tags_str = ', '.join(
+                    f"#{tag_name}" if tag_name.casefold() in search_tag_names else tag_name
+                    for tag_name in shown_tags
+                )
+            else:
+                tags_str = ', '.join(shown_tags)
+            if extra_tags:
+                tags_str += f' (+{extra_tags} more)'
 
-    subtitle = ' • '.join(subtitle_parts)
+    if url_text and collection_text and tags_str:
+        # The usual shape: every part present
+        subtitle = f"{url_text} • {collection_text} • {tags_str}"
+    else:
+        subtitle = ' • '.join(part for part in (url_text, collection_text, tags_str) if part)
 
-    return create_alfred_item(
+    return _create_item(
         title=title,
         subtitle=subtitle,
         arg=url,
@@ -97,39 +108,70 @@ def main():
         tag_filters = parsed['tags']
         collection_filters = parsed['collections']
 
+        # Case-fold the filter names once, for ID lookup and for highlighting
+        # in every result. casefold() also matches names that lower() misses
+        # (e.g. "Straße" and "STRASSE") and is as fast for ASCII names.
+        folded_tag_filters = [name.casefold() for name in tag_filters]
+        folded_collection_filters = [name.casefold() for name in collection_filters]
+        parsed['_tags_folded'] = frozenset(folded_tag_filters)
+
         # Build search parameters
         collection_ids = []
         tag_ids = []
 
-        # Find collection IDs for all collection filters
+        # Filter names that match nothing; reported instead of dropped silently
+        unknown_filters = []
+
+        # Resolve filter names to IDs through case-insensitive name indexes
+        # (first match wins, as with a linear scan)
+        if collection_filters and tag_filters:
+            tags, collections = api.get_tags_and_collections()
+        else:
+            collections = api.get_collections() if collection_filters else []
+            tags = api.get_tags() if tag_filters else []
+
         if collection_filters:
-            collections = api.get_collections()
-            for collection_name in collection_filters:
-                for collection in collections:
-                    if collection.get('name', '').lower() == collection_name.lower():
-                        collection_ids.append(str(collection.get('id')))
-                        break
-
-        # Find tag IDs for all tag filters
+            collection_index = {}
+            for collection in collections:
+                name = collection.get('name')
+                if name:
+                    collection_index.setdefault(name.casefold(), str(collection.get('id')))
+            for name, folded in zip(collection_filters, folded_collection_filters):
+                if folded in collection_index:
+                    collection_ids.append(collection_index[folded])
+                else:
+                    unknown_filters.append(('collection', f"@{name}"))
+
         if tag_filters:
-            tags = api.get_tags()
-            for tag_name in tag_filters:
-                for tag in tags:
-                    if tag.get('name', '').lower() == tag_name.lower():
-                        tag_ids.append(str(tag.get('id')))
-                        break
+            tag_index = {}
+            for tag in tags:
+                name = tag.get('name')
+                if name:
+                    tag_index.setdefault(name.casefold(), str(tag.get('id')))
+            for name, folded in zip(tag_filters, folded_tag_filters):
+                if folded in tag_index:
+                    tag_ids.append(tag_index[folded])
+                else:
+                    unknown_filters.append(('tag', f"#{name}"))
 
         # Search links with enhanced filtering
         links = api.search_links(
             query=search_query,
             collection_ids=collection_ids,
             tag_ids=tag_ids,
-            limit=20
+            limit=SEARCH_RESULT_LIMIT
         )
 
+        warning_items = [create_alfred_item(
+            title=f"Unknown {kind}: {label}",
+            subtitle=f"No {kind} named '{label[1:]}' - results are not filtered by it",
+            arg="",
+            valid=False
+        ) for kind, label in unknown_filters]
+
         if not links:
             # Show help message when no results
-            help_items = []
+            help_items = warning_items
 
             if query.strip() == "":
                 help_items.append(create_alfred_item(
@@ -162,10 +204,10 @@ def main():
             return
 
         # Format links for Alfred
-        alfred_items = [format_link_item(link, parsed) for link in links]
+        alfred_items = warning_items + [format_link_item(link, parsed) for link in links]
 
         # Add search tips if there are results but user might want to refine
-        if len(alfred_items) == 20:  # Max results reached
+        if len(links) >= SEARCH_RESULT_LIMIT:  # Max results reached
             alfred_items.append(create_alfred_item(
                 title="More results available...",
                 subtitle="Refine your search to see more specific results",